@@ -7,7 +7,7 @@ import webrtcvad
 import subprocess
 from scipy.signal import butter, lfilter
 import noisereduce as nr
-from typing import Dict
+from typing import Iterator, List, Optional, Tuple
 
 from config import (
     VAD_AGGRESSIVENESS, VAD_FRAME_MS, VAD_BYTES_PER_FRAME,
@@ -45,36 +45,92 @@ async def create_ffmpeg_process(stream_id: str):
     logging.info(f"[{stream_id}] FFmpeg 프로세스 생성됨 (PID: {proc.pid}).")
     return proc
 
+async def decode_audio_file(path: str) -> bytes:
+    # 오디오/비디오 파일을 한 번에 16kHz 모노 s16le PCM으로 디코딩
+    command = ["ffmpeg", "-nostdin", "-i", path, "-vn", "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"]
+    proc = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    pcm_bytes, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"FFmpeg 디코딩 실패 ({path}): {stderr.decode(errors='ignore').strip()[-500:]}")
+    return pcm_bytes
+
+# --- VAD 기반 발화 구간 분할기 (실시간 태스크와 파일 전사가 공유) ---
+class SpeechSegmenter:
+    """s16le PCM을 VAD 프레임 단위로 받아, 침묵으로 끝난 발화 구간을 (시작 시각(초), int16 오디오)로 내보낸다."""
+
+    def __init__(self, silence_threshold_s: float):
+        self.vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
+        self.pcm_buffer, self.speech_buffer = bytearray(), bytearray()
+        self.is_speaking, self.silence_frames_count = False, 0
+        self.max_silence_frames = int(silence_threshold_s * 1000 / VAD_FRAME_MS)
+        self.min_audio_bytes = int(MIN_AUDIO_DURATION_S * SAMPLE_RATE * 2)
+        self.consumed_bytes = 0  # 지금까지 VAD에 넣은 바이트 수 (구간 시작 시각 계산용)
+        self.segment_start = 0
+
+    def feed(self, pcm_chunk: bytes) -> List[Tuple[float, np.ndarray]]:
+        self.pcm_buffer.extend(pcm_chunk)
+        segments, offset = [], 0
+        while len(self.pcm_buffer) - offset >= VAD_BYTES_PER_FRAME:
+            frame = bytes(self.pcm_buffer[offset:offset + VAD_BYTES_PER_FRAME])
+            offset += VAD_BYTES_PER_FRAME
+            is_speech = self.vad.is_speech(frame, SAMPLE_RATE)
+            if self.is_speaking:
+                self.speech_buffer.extend(frame)
+                if not is_speech:
+                    self.silence_frames_count += 1
+                    if self.silence_frames_count > self.max_silence_frames:
+                        self.is_speaking = False
+                        segment = self._take_segment()
+                        if segment: segments.append(segment)
+                else: self.silence_frames_count = 0
+            elif is_speech:
+                self.is_speaking, self.silence_frames_count = True, 0
+                self.segment_start = self.consumed_bytes
+                self.speech_buffer.extend(frame)
+            self.consumed_bytes += VAD_BYTES_PER_FRAME
+        # 처리한 프레임은 한 번에 제거 (프레임마다 버퍼를 다시 만들지 않음)
+        del self.pcm_buffer[:offset]
+        return segments
+
+    def flush(self) -> Optional[Tuple[float, np.ndarray]]:
+        # 입력이 끝났을 때 말하는 중이던 구간을 내보냄 (파일 전사용)
+        self.is_speaking = False
+        return self._take_segment()
+
+    def _take_segment(self) -> Optional[Tuple[float, np.ndarray]]:
+        segment = None
+        if len(self.speech_buffer) > self.min_audio_bytes:
+            segment = (self.segment_start / (SAMPLE_RATE * 2), np.frombuffer(self.speech_buffer, dtype=np.int16).copy())
+        self.speech_buffer.clear()
+        return segment
+
+def iter_speech_segments(pcm_bytes: bytes, silence_threshold_s: float) -> Iterator[Tuple[float, np.ndarray]]:
+    """s16le PCM 전체를 실시간과 같은 규칙으로 분할하여 (시작 시각(초), int16 오디오) 튜플을 순서대로 반환한다."""
+    segmenter = SpeechSegmenter(silence_threshold_s)
+    chunk_bytes = VAD_BYTES_PER_FRAME * 1000  # 파일 전체를 버퍼에 복사하지 않도록 나눠서 넣음
+    for offset in range(0, len(pcm_bytes), chunk_bytes):
+        yield from segmenter.feed(pcm_bytes[offset:offset + chunk_bytes])
+    tail = segmenter.flush()
+    if tail:
+        yield tail
+
 # --- VAD 기반 PCM 처리 태스크 ---
 # [핵심 수정] 이 함수는 이제 WhisperModel 객체를 직접 받으므로, 타입 힌팅이 필요 없음
-async def pcm_processing_task(stream_id: str, pcm_queue: asyncio.Queue, text_queue: asyncio.Queue, text_buffer_ref: Dict, whisper_model, silence_threshold_s: float):
+async def pcm_processing_task(stream_id: str, pcm_queue: asyncio.Queue, text_queue: asyncio.Queue, prompt_context, whisper_model, silence_threshold_s: float):
     logging.info(f"[{stream_id}] PCM 처리 태스크 시작됨.")
-    vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
-    pcm_buffer, speech_buffer = bytearray(), bytearray()
-    is_speaking, silence_frames_count = False, 0
-    max_silence_frames = int(silence_threshold_s * 1000 / VAD_FRAME_MS)
-    min_audio_bytes = int(MIN_AUDIO_DURATION_S * SAMPLE_RATE * 2)
+    segmenter = SpeechSegmenter(silence_threshold_s)
 
     try:
         while True:
             pcm_chunk = await pcm_queue.get()
-            pcm_buffer.extend(pcm_chunk)
-            while len(pcm_buffer) >= VAD_BYTES_PER_FRAME:
-                frame = pcm_buffer[:VAD_BYTES_PER_FRAME];
-                pcm_buffer = pcm_buffer[VAD_BYTES_PER_FRAME:]
-                is_speech = vad.is_speech(frame, SAMPLE_RATE)
-                if is_speaking:
-                    speech_buffer.extend(frame)
-                    if not is_speech:
-                        silence_frames_count += 1
-                        if silence_frames_count > max_silence_frames:
-                            is_speaking = False
-                            if len(speech_buffer) > min_audio_bytes:
-                                audio_np = np.frombuffer(speech_buffer, dtype=np.int16).copy()
-                                original = await whisper_model.transcribe(audio_np, previous_text=text_buffer_ref['buffer'])
-                                if original: await text_queue.put(original)
-                            speech_buffer.clear()
-                    else: silence_frames_count = 0
-                elif is_speech: is_speaking, silence_frames_count = True, 0; speech_buffer.extend(frame)
+            for _, audio_np in segmenter.feed(pcm_chunk):
+                original = await whisper_model.transcribe(audio_np, prompt_context=prompt_context)
+                if original:
+                    prompt_context.commit(original)
+                    await text_queue.put(original)
     except asyncio.CancelledError: logging.info(f"[{stream_id}] PCM 처리 태스크 취소됨.")
     except Exception as e: logging.error(f"[{stream_id}] PCM 처리 태스크에서 치명적 오류 발생:", exc_info=True)
\ No newline at end of file
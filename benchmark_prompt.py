@@ -0,0 +1,136 @@
+# benchmark_prompt.py
+#
+# 기존 방식(번역 전 문장 전체를 initial_prompt로 전달)과
+# PromptContext(토큰 제한 + 용어집 + 토큰 캐시) 방식의 디코딩 시간/정확도 비교.
+#
+# baseline은 stream_manager의 번역(버퍼 비움) 규칙을 오디오 시간축 위에서 재현한다.
+#  - 문장 종결 어미(SENTENCE_ENDINGS)로 끝나면 즉시 비움
+#  - 다음 발화가 도착하기 전 TRANSLATION_TIMEOUT_S 이상 비었고, 충분히 길며,
+#    연결어/연결 어미로 끝나지 않으면 비움
+# 발화 도착 시각은 구간 끝 시각으로 두며, 실제 디코딩 지연과 0.5초 폴링 간격은 반영하지 않는다.
+#
+# 사용 예시:
+#   python benchmark_prompt.py 녹음.mp4 --reference 정답.txt --hotwords "제노글로벌, 홍길동"
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+from audio_processing import decode_audio_file, iter_speech_segments
+from config import (
+    SILENCE_THRESHOLD_S, SAMPLE_RATE, SENTENCE_ENDINGS,
+    TRANSLATION_TIMEOUT_S, MIN_LENGTH_FOR_TIMEOUT_TRANSLATION
+)
+from models import WhisperModel
+from stream_manager import is_semantically_incomplete
+
+def edit_distance(a: str, b: str) -> int:
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        curr = [i]
+        for j, cb in enumerate(b, 1):
+            curr.append(min(prev[j] + 1, curr[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = curr
+    return prev[-1]
+
+def character_error_rate(hypothesis: str, reference: str) -> float:
+    # 한국어 띄어쓰기 편차를 배제하기 위해 공백을 제거하고 글자 단위로 비교
+    hyp, ref = "".join(hypothesis.split()), "".join(reference.split())
+    return edit_distance(hyp, ref) / max(len(ref), 1)
+
+async def run_mode(mode: str, whisper_model: WhisperModel, segments: List, hotwords: List[str]) -> dict:
+    prompt_context = whisper_model.create_prompt_context(hotwords) if mode == 'context' else None
+    sentence_buffer = ""
+    last_text_time = None
+    texts, decode_times, prompt_lengths = [], [], []
+
+    for start_s, audio_np in segments:
+        arrival_s = start_s + len(audio_np) / SAMPLE_RATE
+        if not prompt_context and sentence_buffer and last_text_time is not None:
+            # 타임아웃 경로: 이전 텍스트 이후 충분히 조용했다면 이 발화를 인식하기 전에 이미 번역되었음
+            is_timeout = arrival_s - last_text_time > TRANSLATION_TIMEOUT_S
+            is_long_enough = len(sentence_buffer) >= MIN_LENGTH_FOR_TIMEOUT_TRANSLATION
+            if is_timeout and is_long_enough and not is_semantically_incomplete(sentence_buffer):
+                sentence_buffer = ""
+
+        if prompt_context:
+            prompt_lengths.append(len(prompt_context.prompt_ids() or []))
+        else:
+            prompt_lengths.append(len(whisper_model.encode_text(" " + sentence_buffer)) if sentence_buffer else 0)
+
+        started = time.perf_counter()
+        if prompt_context:
+            text = await whisper_model.transcribe(audio_np, prompt_context=prompt_context)
+        else:
+            text = await whisper_model.transcribe(audio_np, previous_text=sentence_buffer)
+        decode_times.append(time.perf_counter() - started)
+
+        if not text:
+            continue
+        texts.append(text)
+        if prompt_context:
+            prompt_context.commit(text)
+        else:
+            # 기존 동작 재현: 문장이 끝나 번역될 때까지 버퍼가 계속 자람
+            sentence_buffer = f"{sentence_buffer} {text}".strip()
+            last_text_time = arrival_s
+            if sentence_buffer.endswith(SENTENCE_ENDINGS):
+                sentence_buffer = ""
+
+    return {
+        'text': " ".join(texts),
+        'total_s': sum(decode_times),
+        'mean_s': sum(decode_times) / max(len(decode_times), 1),
+        'max_s': max(decode_times, default=0.0),
+        'mean_prompt_tokens': sum(prompt_lengths) / max(len(prompt_lengths), 1),
+        'max_prompt_tokens': max(prompt_lengths, default=0),
+    }
+
+async def main(audio_path: str, reference_path: Optional[str], hotwords: List[str], silence_threshold: float, repeats: int):
+    whisper_model = WhisperModel()
+    pcm_bytes = await decode_audio_file(audio_path)
+    segments = list(iter_speech_segments(pcm_bytes, silence_threshold))
+    logging.info(f"{len(segments)}개 발화 구간 추출됨.")
+
+    reference = None
+    if reference_path:
+        with open(reference_path, encoding='utf-8') as f:
+            reference = f.read()
+
+    # 첫 디코딩에 몰리는 CUDA/CTranslate2 초기화 비용이 한쪽 모드에만 들어가지 않도록 측정 전에 한 번 디코딩
+    if segments:
+        await whisper_model.transcribe(segments[0][1])
+
+    # 모드 실행 순서를 번갈아 바꾸며 반복하고, 시간은 반복 평균으로 보고
+    runs = {'baseline': [], 'context': []}
+    for repeat in range(repeats):
+        order = ('baseline', 'context') if repeat % 2 == 0 else ('context', 'baseline')
+        for mode in order:
+            runs[mode].append(await run_mode(mode, whisper_model, segments, hotwords))
+
+    print("=" * 78)
+    print(f"{'mode':<10}{'total(s)':>10}{'mean(s)':>10}{'max(s)':>10}{'prompt avg':>12}{'prompt max':>12}{'CER':>10}")
+    print("-" * 78)
+    for mode, results in runs.items():
+        result = results[-1]
+        total_s = sum(r['total_s'] for r in results) / len(results)
+        mean_s = sum(r['mean_s'] for r in results) / len(results)
+        max_s = max(r['max_s'] for r in results)
+        cer = f"{character_error_rate(result['text'], reference):.2%}" if reference else "-"
+        print(f"{mode:<10}{total_s:>10.2f}{mean_s:>10.3f}{max_s:>10.3f}"
+              f"{result['mean_prompt_tokens']:>12.1f}{result['max_prompt_tokens']:>12d}{cer:>10}")
+    print("=" * 78)
+    print(f"시간은 {repeats}회 반복 평균 (최대값은 전체 반복 중 최대), 실행 순서는 반복마다 교대.")
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="initial_prompt 방식별 디코딩 시간/정확도 비교")
+    parser.add_argument('audio', help="오디오 또는 비디오 파일 경로")
+    parser.add_argument('--reference', help="정답 전사 텍스트 파일 (CER 계산용)")
+    parser.add_argument('--hotwords', default="", help="쉼표로 구분한 용어집")
+    parser.add_argument('--silence', type=float, default=SILENCE_THRESHOLD_S, help="문장 끝 침묵 구간(초)")
+    parser.add_argument('--repeats', type=int, default=2, help="모드별 반복 횟수 (순서를 교대하며 실행)")
+    args = parser.parse_args()
+    asyncio.run(main(args.audio, args.reference, [w for w in args.hotwords.split(',') if w.strip()], args.silence, max(args.repeats, 1)))
@@ -21,6 +21,26 @@ MIN_AUDIO_DURATION_S = 1.2
 TRANSLATION_TIMEOUT_S = 1.5
 MIN_LENGTH_FOR_TIMEOUT_TRANSLATION = 5
 
+# --- 프롬프트 컨텍스트 설정 ---
+# Whisper initial_prompt로 넘길 최대 토큰 수 (용어집 + 최근 인식 문장)
+PROMPT_MAX_TOKENS = 128
+# 그중 용어집(핫워드)이 차지할 수 있는 최대 토큰 수
+PROMPT_GLOSSARY_MAX_TOKENS = 48
+# 세션별 용어집 기본값 (행사명, 연사 이름 등)
+DEFAULT_HOTWORDS = []
+
+# --- 오프라인(파일) 전사 설정 ---
+# 파일 전사는 컨트롤러가 연결된 실시간 세션이 하나도 없고, 마지막 실시간 인식 후
+# OFFLINE_LIVE_COOLDOWN_S가 지났을 때만 다음 배치를 시작한다 (배치 사이마다 다시 확인).
+# 이미 시작된 배치는 중단할 수 없으므로, 배치 도중 새 방송이 연결되면 그 방송의 첫 발화는
+# 진행 중인 배치 하나가 끝날 때까지 기다릴 수 있다.
+OFFLINE_BATCH_SIZE = 16          # 한 번의 배치 추론에 넣을 Whisper 입력 창 수 (창 하나 = 최대 OFFLINE_MAX_CLIP_S초)
+OFFLINE_MAX_CLIP_S = 30          # Whisper 입력 창 길이. 짧은 발화는 이 길이까지 묶고, 긴 발화는 나눠서 추론
+OFFLINE_LIVE_COOLDOWN_S = 10     # 마지막 실시간 인식 이후 배치를 시작하기까지 기다릴 시간(초)
+OFFLINE_LIVE_POLL_S = 1.0        # 실시간 활동이 있을 때 다시 확인하는 간격(초)
+OFFLINE_MAX_JOBS = 20            # 메모리에 보관할 최대 작업 수 (완료된 오래된 작업부터 제거)
+OFFLINE_MAX_UPLOAD_MB = 2048     # 업로드 파일 최대 크기(MB)
+
 # --- 번역기 기본엔진 설정 ---
 TRANSLATION_ENGINE = 'deepl'
 
@@ -31,6 +51,8 @@ NAVER_CLIENT_SECRET=os.getenv("NAVER_CLIENT_SECRET")
 GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 
 # --- 문장 연결 규칙 ---
+# 이 어미로 끝나면 타임아웃을 기다리지 않고 바로 번역
+SENTENCE_ENDINGS = ('습니다.', '니다.', '까요?', '이죠?', '데요!', '하죠.', '시오.')
 CONNECTING_WORDS = [
     '그리고', '그래서', '그러나', '하지만', '그런데', '또한', '또는', '즉', '및',
     '대해', '따라', '위해', '통해', '관련', '대한', '관해', '대하여', '비해', '따르면'
@@ -65,6 +65,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const silenceThresholdSlider = document.getElementById('silence-threshold-slider');
     const silenceThresholdValue = document.getElementById('silence-threshold-value');
     const translationEngineSelect = document.getElementById('translation-engine-select');
+    const hotwordsInput = document.getElementById('hotwords-input');
     const openViewerLink = document.getElementById('open-viewer-link');
     let socket, mediaRecorder, mediaStream, animationFrameId;
     let isStreaming = false;
@@ -121,6 +122,9 @@ document.addEventListener('DOMContentLoaded', () => {
         updateSettingsOnServer(); // 변경된 설정(언어 선택 포함)을 서버로 전송
     });
 
+    // 용어집은 입력을 마쳤을 때(포커스 해제/엔터) 서버로 전송
+    hotwordsInput.addEventListener('change', updateSettingsOnServer);
+
     // 언어 선택 변경 시에도 서버로 설정 전송
     langSelects.forEach(select => {
         select.addEventListener('change', updateSettingsOnServer);
@@ -412,6 +416,10 @@ document.addEventListener('DOMContentLoaded', () => {
                         // [핵심 수정] 서버에서 받은 엔진 정보로 언어 목록 업데이트
                         populateLanguageSelects(engine);
                     }
+
+                    if (data.settings.hotwords) {
+                        hotwordsInput.value = data.settings.hotwords.join(', ');
+                    }
                     break;
                 case "interim_result":
                     updateOutput(outputElem, data.text, "interim");
@@ -509,13 +517,15 @@ document.addEventListener('DOMContentLoaded', () => {
             const languages = [...new Set(activeLanguages)];
             const silenceThreshold = parseFloat(silenceThresholdSlider.value);
             const translationEngine = translationEngineSelect.value;
+            const hotwords = hotwordsInput.value.split(',').map(w => w.trim()).filter(w => w);
 
             // 하나의 config 메시지로 통합하여 전송
             const configMessage = {
                 type: 'config',
                 languages: languages,
                 silence_threshold: silenceThreshold,
-                translation_engine: translationEngine
+                translation_engine: translationEngine,
+                hotwords: hotwords
             };
             
             console.log("서버로 설정 전송:", configMessage);
@@ -24,6 +24,11 @@ document.addEventListener('DOMContentLoaded', () => {
     const LANG_NAMES = { "en": "영어", "ja": "일본어", "zh": "중국어", "vi": "베트남어", "id": "인도네시아어", "tr": "터키어", "de": "독일어", "it": "이탈리아어", "pt": "포르투갈어", "fr": "프랑스어" };
     const MAX_LINES = 10;
     let interimElement = null;
+    let socket = null;
+    let subscribedLangs = null;
+    // [추가] ?lang=en,ja 로 볼 언어를 지정하면 해당 언어의 번역만 수신
+    const requestedLangs = (new URLSearchParams(window.location.search).get('lang') || '')
+        .split(',').map(l => l.trim()).filter(l => l);
 
     // --- 범용 UI 업데이트 함수 ---
     function updateOutput(container, text, type, id = null) {
@@ -68,8 +73,10 @@ document.addEventListener('DOMContentLoaded', () => {
     // --- WebSocket 연결 및 메시지 처리 ---
     function connectWebSocket() {
         // [수정] WebSocket 주소에 스트림 ID 포함
-        const wsUrl = `${window.location.protocol === 'https:' ? 'wss:' : 'ws:'}//${window.location.host}/ws/liveasr/watch/${streamId}`;
-        const socket = new WebSocket(wsUrl);
+        let wsUrl = `${window.location.protocol === 'https:' ? 'wss:' : 'ws:'}//${window.location.host}/ws/liveasr/watch/${streamId}`;
+        if (requestedLangs.length) wsUrl += `?languages=${encodeURIComponent(requestedLangs.join(','))}`;
+        socket = new WebSocket(wsUrl);
+        subscribedLangs = null;
 
         socket.onmessage = (event) => {
             const data = JSON.parse(event.data);
@@ -109,6 +116,13 @@ document.addEventListener('DOMContentLoaded', () => {
     function updatePanelHeaders(languages) {
         // 모든 번역 패널을 일단 숨김
         transPanels.forEach(panel => panel.style.display = 'none');
+
+        // 지정한 언어가 있으면 그 언어만, 없으면 앞에서부터 패널 수만큼 표시
+        if (requestedLangs.length) {
+            languages = languages.filter(l => requestedLangs.includes(l));
+        }
+        languages = languages.slice(0, transPanels.length);
+        subscribeLanguages(languages);
 		
 		gridContainer.classList.remove('grid-container1', 'grid-container2', 'grid-container3');
 		
@@ -136,6 +150,16 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     }
     
+    // 화면에 표시하는 언어만 서버에 구독 요청 (URL로 지정한 경우 접속 시 이미 구독됨)
+    // 표시할 언어가 없으면 빈 목록을 보내 이전 구독을 해제
+    function subscribeLanguages(languages) {
+        if (requestedLangs.length) return;
+        const key = languages.join(',');
+        if (key === subscribedLangs || !socket || socket.readyState !== WebSocket.OPEN) return;
+        socket.send(JSON.stringify({ type: 'subscribe', languages: languages }));
+        subscribedLangs = key;
+    }
+    
     panels.forEach(panel => {
         panel.addEventListener('click', () => {
             if (panel.classList.contains('zoomed-in')) {
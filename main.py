@@ -4,16 +4,19 @@ import uvicorn
 import os
 import logging
 import asyncio
+import tempfile
+from urllib.parse import quote
 from contextlib import asynccontextmanager
 from typing import Optional
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, status
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, status, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import FileResponse, PlainTextResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 
 # --- 모듈화된 파일 임포트 ---
 import config
-from models import WhisperModel
+from models import WhisperModel, TRANSLATORS
 from stream_manager import stream_manager
+from transcription_jobs import TranscriptionJob, job_manager
 
 # --- 로깅 설정 ---
 #logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -27,8 +30,10 @@ app_ready = asyncio.Event() # [핵심 추가] 앱 준비 상태를 알리는 이
 async def lifespan(app: FastAPI):
     global whisper_model_instance
     whisper_model_instance = WhisperModel()
+    job_manager.start(whisper_model_instance, stream_manager.has_active_streams) # [추가] 파일 전사 작업 큐 (실시간 방송이 없을 때만 진행)
     app_ready.set() # [핵심 추가] 모델 로드가 끝나면, 앱이 준비되었음을 알림
     yield
+    await job_manager.stop()
     logging.info("서버 종료.")
 
 # --- FastAPI 앱 설정 ---
@@ -43,6 +48,89 @@ templates_path = os.path.join(os.path.dirname(__file__), "templates")
 async def get_watch_page(stream_id: str):
     return FileResponse(os.path.join(templates_path, "watch.html"))
 
+# --- 파일 전사 작업 API ---
+# 주의: 업로드(File/Form) 처리를 위해 python-multipart 패키지가 필요함
+MAX_UPLOAD_BYTES = config.OFFLINE_MAX_UPLOAD_MB * 1024 * 1024
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    # 멀티파트 본문이 임시 파일로 저장되기 전에 크기를 확인
+    if request.method == "POST" and request.url.path == "/liveasr/jobs":
+        content_length = request.headers.get("content-length")
+        if not content_length or not content_length.isdigit():
+            return JSONResponse(status_code=status.HTTP_411_LENGTH_REQUIRED, content={"detail": "Content-Length 헤더가 필요합니다."})
+        if int(content_length) > MAX_UPLOAD_BYTES:
+            return JSONResponse(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, content={"detail": f"업로드 파일은 {config.OFFLINE_MAX_UPLOAD_MB}MB 이하여야 합니다."})
+    return await call_next(request)
+
+def save_upload(source, destination, max_bytes: int) -> int:
+    copied = 0
+    while chunk := source.read(1024 * 1024):
+        copied += len(chunk)
+        if copied > max_bytes:
+            raise ValueError("업로드 크기 제한 초과")
+        destination.write(chunk)
+    return copied
+
+@app.post("/liveasr/jobs")
+async def create_transcription_job(
+    file: UploadFile = File(...),
+    languages: str = Form(""),
+    translation_engine: str = Form(config.TRANSLATION_ENGINE),
+    hotwords: str = Form("")
+):
+    language_list = [lang.strip() for lang in languages.split(',') if lang.strip()]
+    if language_list and translation_engine not in TRANSLATORS:
+        raise HTTPException(status_code=400, detail=f"'{translation_engine}' 번역기를 서버에서 사용할 수 없습니다.")
+
+    # FFmpeg가 컨테이너(mp4 등)를 탐색할 수 있도록 업로드 파일을 임시 파일로 저장
+    suffix = os.path.splitext(file.filename or "")[1]
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        try:
+            await asyncio.to_thread(save_upload, file.file, tmp, MAX_UPLOAD_BYTES)
+        except ValueError:
+            tmp.close()
+            os.remove(tmp.name)
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"업로드 파일은 {config.OFFLINE_MAX_UPLOAD_MB}MB 이하여야 합니다.")
+        finally:
+            await file.close()
+
+    job = TranscriptionJob(
+        filename=file.filename or os.path.basename(tmp.name),
+        file_path=tmp.name,
+        languages=language_list,
+        translation_engine=translation_engine,
+        hotwords=[word.strip() for word in hotwords.split(',') if word.strip()]
+    )
+    await job_manager.submit(job)
+    return job.to_status()
+
+@app.get("/liveasr/jobs/{job_id}")
+async def get_transcription_job(job_id: str):
+    job = job_manager.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job.to_status()
+
+@app.get("/liveasr/jobs/{job_id}/result")
+async def get_transcription_result(job_id: str, format: str = "json", lang: Optional[str] = None):
+    job = job_manager.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    if job.status != 'completed':
+        raise HTTPException(status_code=409, detail=f"작업이 아직 완료되지 않았습니다. (상태: {job.status})")
+    if lang and lang not in job.languages:
+        raise HTTPException(status_code=400, detail=f"'{lang}' 언어는 이 작업의 번역 대상이 아닙니다.")
+
+    if format == "srt":
+        srt_name = f"{os.path.splitext(job.filename)[0]}{'.' + lang if lang else ''}.srt"
+        return PlainTextResponse(
+            job.to_srt(lang),
+            media_type="application/x-subrip",
+            headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(srt_name)}"}
+        )
+    return job.to_json()
+
 @app.get("/liveasr/{stream_id}")
 async def get_control_page(stream_id: str):
     return FileResponse(os.path.join(templates_path, "index.html"))
@@ -64,11 +152,19 @@ async def websocket_watch_endpoint(websocket: WebSocket, stream_id: str):
     await app_ready.wait() # 앱이 완전히 준비될 때까지 여기서 대기
 
     session = await stream_manager.get_or_create_session(stream_id)
+    # [추가] ?languages=en,ja 형태로 구독할 번역 언어 지정 (미지정 시 전체 언어)
+    languages = [lang for lang in websocket.query_params.get('languages', '').split(',') if lang] or None
     try:
-        await session.add_viewer(websocket)
+        await session.add_viewer(websocket, languages)
         while True:
-            await websocket.receive_text()
+            message = await websocket.receive_text()
+            await session.handle_viewer_message(websocket, message)
     except WebSocketDisconnect:
+        pass
+    except Exception:
+        logging.error(f"[{stream_id}] 뷰어 연결 처리 중 오류 발생:", exc_info=True)
+    finally:
+        # 어떤 이유로 끝나든 끊긴 소켓이 브로드캐스트 대상에 남지 않도록 정리
         session.remove_viewer(websocket)
         stream_manager.remove_session_if_empty(stream_id)
 
@@ -137,6 +233,7 @@ if __name__ == '__main__':
     print("\n사용 예시:")
     print(f"  - 컨트롤러: {PROTOCOL}://127.0.0.1:{PORT}/liveasr/my_stream_1")
     print(f"  - 뷰어: {PROTOCOL}://127.0.0.1:{PORT}/liveasr/watch/my_stream_1")
+    print(f"  - 파일 전사: POST {PROTOCOL}://127.0.0.1:{PORT}/liveasr/jobs (file, languages, translation_engine, hotwords)")
     print("\n서버를 중지하려면 CTRL+C를 누르세요.")
     
     # [수정] uvicorn.run() 호출 방식을 딕셔너리 unpacking으로 통일합니다.
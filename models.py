@@ -3,19 +3,23 @@
 import torch
 import deepl
 import asyncio
+import bisect
 import logging
+import time
 import numpy as np
 import aiohttp  # [추가] Papago 비동기 요청용
 import html # [추가] HTML 엔티티 디코딩을 위한 표준 라이브러리
 from abc import ABC, abstractmethod
-from faster_whisper import WhisperModel as FasterWhisperModel
+from typing import List, Optional, Tuple
+from faster_whisper import WhisperModel as FasterWhisperModel, BatchedInferencePipeline
 
 from google.cloud import translate_v2 as translate # 구글 번역
 
 # 모듈화된 파일에서 필요한 요소 임포트
 from audio_processing import preprocess_audio
+from prompt_context import PromptContext
 from config import (
-    MODEL_NAME, TARGET_LANGUAGE, DEEPL_API_KEY, 
+    MODEL_NAME, TARGET_LANGUAGE, SAMPLE_RATE, OFFLINE_BATCH_SIZE, DEEPL_API_KEY, 
     NAVER_CLIENT_ID, NAVER_CLIENT_SECRET, GOOGLE_APPLICATION_CREDENTIALS
 )
 
@@ -110,31 +114,103 @@ class WhisperModel:
         compute_type = "float16" if self.device == "cuda" else "int8"
         logging.info(f"Whisper 모델 로드 중 ({MODEL_NAME}, Device: {self.device}, Compute Type: {compute_type})...")
         self.model = FasterWhisperModel(MODEL_NAME, device=self.device, compute_type=compute_type)
+        # [추가] 파일 전사용 배치 파이프라인 (같은 모델 가중치를 공유)
+        self.batched_model = BatchedInferencePipeline(model=self.model)
+        # [추가] 파일 전사 작업이 실시간 인식 활동을 판단할 수 있도록 진행 중인 요청 수와 마지막 요청 시각을 기록
+        self.live_requests = 0
+        self.last_live_request_at = float('-inf')
         logging.info("모델 로드 완료.")
         
-    async def transcribe(self, audio_buffer: np.ndarray, previous_text: str = None) -> str:
+    def encode_text(self, text: str) -> List[int]:
+        # faster-whisper가 initial_prompt 문자열을 토큰화하는 방식과 동일 (특수 토큰 제외)
+        return self.model.hf_tokenizer.encode(text, add_special_tokens=False).ids
+
+    def create_prompt_context(self, hotwords: Optional[List[str]] = None) -> PromptContext:
+        return PromptContext(self.encode_text, hotwords=hotwords)
+
+    async def transcribe(self, audio_buffer: np.ndarray, previous_text: str = None, prompt_context: Optional[PromptContext] = None) -> str:
+        self.live_requests += 1
         try:
             processed_audio = preprocess_audio(audio_buffer)
+            # [수정] 프롬프트 컨텍스트가 있으면 캐시된 토큰 ID를 그대로 사용 (재토큰화 없음)
+            prompt = prompt_context.prompt_ids() if prompt_context else previous_text
             segments, _ = await asyncio.to_thread(
                 self.model.transcribe,
                 processed_audio,
                 beam_size=5,
                 language=TARGET_LANGUAGE,
-                initial_prompt=previous_text,
-                condition_on_previous_text=bool(previous_text)
+                initial_prompt=prompt,
+                condition_on_previous_text=bool(prompt)
             )
             full_text = "".join(segment.text for segment in segments).strip()
-            if full_text:
-                hallucination_blacklist = ["감사합니다", "시청해주셔서 감사합니다", "한국어 음성 대화", "다음 영상에서 만나요."]
-                is_hallucination = any(word in full_text and len(full_text) < len(word) + 5 for word in hallucination_blacklist)
-                if not is_hallucination:
-                    return full_text
-                else:
-                    logging.warning(f"환각 의심 결과 필터링됨: '{full_text}'")
+            if full_text and not self._is_hallucination(full_text):
+                return full_text
         except Exception as e:
             logging.error(f"인식 오류: {e}")
+        finally:
+            self.live_requests -= 1
+            self.last_live_request_at = time.monotonic()
         return ""
 
+    async def transcribe_batch(self, windows: List[List[Tuple[float, np.ndarray]]], prompt_context: Optional[PromptContext] = None) -> List[Tuple[float, float, str]]:
+        """Whisper 입력 창 단위로 묶인 (시작 시각, int16 오디오) 클립들을 한 번의 배치 추론으로 인식한다.
+
+        각 창의 클립 길이 합은 OFFLINE_MAX_CLIP_S 이하여야 하며, 창 하나가 배치의 한 항목이 된다.
+        반환값은 원본 파일 기준 (시작, 끝, 텍스트) 목록이다. 실시간 인식과의 우선순위 조정은 호출하는 쪽의 몫이다.
+        """
+        clips = [clip for window in windows for clip in window]
+        if not clips:
+            return []
+        # 배치 파이프라인은 initial_prompt를 문자열로만 토큰화하므로 ID 목록 대신 텍스트를 전달
+        prompt = (prompt_context.prompt_text() or None) if prompt_context else None
+
+        def run_batch():
+            # 발화 클립만 이어 붙여 처리하고, (압축된 위치 -> 원본 위치) 대응표로 시각을 되돌림
+            processed_clips = [preprocess_audio(audio_np) for _, audio_np in clips]
+            packed_starts, position = [], 0
+            for processed in processed_clips:
+                packed_starts.append(position)
+                position += len(processed)
+            audio = np.concatenate(processed_clips)
+            original_starts = [start_s for start_s, _ in clips]
+
+            # 창 경계는 초 단위로 전달 (파이프라인이 sampling_rate를 곱해 샘플 위치로 변환)
+            clip_timestamps, clip_index = [], 0
+            for window in windows:
+                window_start = packed_starts[clip_index]
+                clip_index += len(window)
+                window_end = packed_starts[clip_index] if clip_index < len(packed_starts) else position
+                clip_timestamps.append({'start': window_start / SAMPLE_RATE, 'end': window_end / SAMPLE_RATE})
+
+            def to_original(seconds: float, is_end: bool = False) -> float:
+                sample = int(round(seconds * SAMPLE_RATE))
+                # 끝 시각이 클립 경계와 같으면 다음 클립이 아니라 앞 클립의 끝으로 봄
+                search = bisect.bisect_left if is_end else bisect.bisect_right
+                index = max(search(packed_starts, sample) - 1, 0)
+                return original_starts[index] + (sample - packed_starts[index]) / SAMPLE_RATE
+
+            segments, _ = self.batched_model.transcribe(
+                audio,
+                beam_size=5,
+                language=TARGET_LANGUAGE,
+                batch_size=OFFLINE_BATCH_SIZE,
+                vad_filter=False,
+                clip_timestamps=clip_timestamps,
+                initial_prompt=prompt,
+                without_timestamps=False
+            )
+            return [(to_original(segment.start), to_original(segment.end, is_end=True), segment.text.strip()) for segment in segments]
+
+        results = await asyncio.to_thread(run_batch)
+        return [(start, end, text) for start, end, text in results if text and not self._is_hallucination(text)]
+
+    def _is_hallucination(self, text: str) -> bool:
+        hallucination_blacklist = ["감사합니다", "시청해주셔서 감사합니다", "한국어 음성 대화", "다음 영상에서 만나요."]
+        is_hallucination = any(word in text and len(text) < len(word) + 5 for word in hallucination_blacklist)
+        if is_hallucination:
+            logging.warning(f"환각 의심 결과 필터링됨: '{text}'")
+        return is_hallucination
+
 # [핵심 수정] 번역 엔진들을 딕셔너리로 관리 (팩토리 패턴)
 TRANSLATORS = {}
 try:
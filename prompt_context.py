@@ -0,0 +1,110 @@
+# prompt_context.py
+
+import logging
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+from config import PROMPT_MAX_TOKENS, PROMPT_GLOSSARY_MAX_TOKENS, DEFAULT_HOTWORDS
+
+def clean_hotwords(hotwords: List[str]) -> List[str]:
+    # 공백 제거 후 빈 항목을 버리고, 순서를 유지하며 중복 제거
+    return list(dict.fromkeys(w.strip() for w in hotwords if w and w.strip()))
+
+class PromptContext:
+    """스트림별 Whisper 프롬프트 관리자.
+
+    용어집(핫워드)과 최근 확정된 인식 문장을 토큰 단위로 제한된 창에 유지하고,
+    토큰화 결과를 캐시하여 발화마다 다시 토큰화하지 않도록 한다.
+    """
+
+    def __init__(self, encode: Callable[[str], List[int]], hotwords: Optional[List[str]] = None,
+                 max_tokens: int = PROMPT_MAX_TOKENS, glossary_max_tokens: int = PROMPT_GLOSSARY_MAX_TOKENS):
+        self.encode = encode
+        self.max_tokens = max_tokens
+        self.glossary_max_tokens = min(glossary_max_tokens, max_tokens)
+        self.hotwords: List[str] = []
+        self.requested_hotwords: Optional[List[str]] = None
+        self.glossary_ids: List[int] = []
+        self.history: Deque[Tuple[str, List[int]]] = deque()
+        self.history_token_count = 0
+        self._prompt_ids: Optional[List[int]] = None
+        self.set_hotwords(DEFAULT_HOTWORDS if hotwords is None else hotwords)
+
+    def set_hotwords(self, hotwords: List[str]):
+        cleaned = clean_hotwords(hotwords)
+        if cleaned == self.requested_hotwords:
+            return
+        self.requested_hotwords = cleaned
+        # 토큰 중간에서 자르면 한글 단어(바이트 BPE)가 깨지므로, 예산에 맞을 때까지 뒤쪽 용어를 통째로 제외
+        kept, glossary_ids = list(cleaned), []
+        while kept:
+            glossary_ids = self.encode(self._glossary_text(kept))
+            if len(glossary_ids) <= self.glossary_max_tokens:
+                break
+            kept.pop()
+        else:
+            glossary_ids = []
+        if len(kept) < len(cleaned):
+            logging.warning(f"용어집이 토큰 예산({self.glossary_max_tokens})을 초과하여 제외됨: {cleaned[len(kept):]}")
+        self.hotwords = kept
+        self.glossary_ids = glossary_ids
+        self._trim_history()
+        self._prompt_ids = None
+
+    def commit(self, text: str):
+        """확정된 인식 결과를 최근 문맥 창에 추가한다 (토큰화는 여기서 한 번만 수행)."""
+        text = text.strip()
+        if not text:
+            return
+        ids = self.encode(" " + text)
+        self.history.append((text, ids))
+        self.history_token_count += len(ids)
+        self._trim_history()
+        self._prompt_ids = None
+
+    def reset(self):
+        """최근 문맥만 비운다. 용어집은 유지된다."""
+        self.history.clear()
+        self.history_token_count = 0
+        self._prompt_ids = None
+
+    def prompt_ids(self) -> Optional[List[int]]:
+        """용어집 + 최근 문맥 토큰 ID 목록. 비어 있으면 None."""
+        if self._prompt_ids is None:
+            ids = list(self.glossary_ids)
+            for _, history_ids in self.history:
+                ids.extend(history_ids)
+            self._prompt_ids = ids
+        return self._prompt_ids or None
+
+    def prompt_text(self) -> str:
+        parts = []
+        if self.hotwords:
+            parts.append(self._glossary_text(self.hotwords).strip())
+        parts.extend(text for text, _ in self.history)
+        return " ".join(parts)
+
+    @staticmethod
+    def _glossary_text(hotwords: List[str]) -> str:
+        return " " + ", ".join(hotwords) + "."
+
+    def _trim_history(self):
+        budget = self.max_tokens - len(self.glossary_ids)
+        while len(self.history) > 1 and self.history_token_count > budget:
+            _, dropped_ids = self.history.popleft()
+            self.history_token_count -= len(dropped_ids)
+        # 한 문장만으로 예산을 넘는 경우, 예산에 맞는 뒤쪽 단어들만 남김
+        # (토큰 중간에서 자르면 바이트 BPE로 인코딩된 한글이 깨지므로 단어 경계에서 다시 토큰화)
+        if self.history and self.history_token_count > budget:
+            text, _ = self.history.pop()
+            kept_text, kept_ids = "", []
+            words = text.split()
+            for start in range(len(words) - 1, -1, -1):
+                candidate = " ".join(words[start:])
+                candidate_ids = self.encode(" " + candidate)
+                if len(candidate_ids) > budget:
+                    break
+                kept_text, kept_ids = candidate, candidate_ids
+            if kept_ids:
+                self.history.append((kept_text, kept_ids))
+            self.history_token_count = len(kept_ids)
@@ -4,60 +4,128 @@ import asyncio
 import logging
 import json
 import time
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 from collections import deque
 from fastapi import WebSocket, WebSocketDisconnect
 
 from models import WhisperModel, TRANSLATORS
+from prompt_context import PromptContext, clean_hotwords
 from audio_processing import create_ffmpeg_process, pcm_processing_task
 from config import (
     CONNECTING_WORDS, CONNECTING_ENDINGS, TRANSLATION_TIMEOUT_S, 
-    MIN_LENGTH_FOR_TIMEOUT_TRANSLATION, SILENCE_THRESHOLD_S, TRANSLATION_ENGINE
+    MIN_LENGTH_FOR_TIMEOUT_TRANSLATION, SILENCE_THRESHOLD_S, TRANSLATION_ENGINE,
+    DEFAULT_HOTWORDS, SENTENCE_ENDINGS
 )
 
+def is_semantically_incomplete(text: str) -> bool:
+    # 연결어/연결 어미로 끝나면 문장이 이어질 가능성이 높으므로 타임아웃 번역을 보류
+    last_word = text.split()[-1] if text.split() else ""
+    return any(last_word.endswith(e) for e in CONNECTING_ENDINGS) or last_word in CONNECTING_WORDS
+
 class StreamSession:
     def __init__(self, stream_id: str, manager: 'StreamManager'):
         self.stream_id = stream_id; 
         self.manager = manager; 
         self.controller: Optional[WebSocket] = None
         self.viewers: List[WebSocket] = []; 
+        # [추가] 언어별 구독 채널. 언어를 지정하지 않은 뷰어는 전체 언어를 수신
+        self.lang_channels: Dict[str, Set[WebSocket]] = {}
+        self.all_lang_viewers: Set[WebSocket] = set()
         self.background_tasks: List[asyncio.Task] = []
          # [수정] 세션별 설정값 저장 변수 추가 및 기본값으로 초기화
         self.silence_threshold = SILENCE_THRESHOLD_S
         self.translation_engine = TRANSLATION_ENGINE
+        self.hotwords: List[str] = clean_hotwords(DEFAULT_HOTWORDS)
+        self.prompt_context: Optional[PromptContext] = None
 
         self.config_data: Dict = {'type': 'config', 'languages': []} 
         self.cache: deque = deque(maxlen=8); 
+        self.translation_cache: Dict[str, deque] = {}
         self.lock = asyncio.Lock()
         self.proc: Optional[asyncio.subprocess.Process] = None
         self.pcm_queue: Optional[asyncio.Queue] = None
         logging.info(f"[{stream_id}] 새로운 스트림 세션 생성됨. (침묵 구간: {self.silence_threshold}s, 엔진: {self.translation_engine})")
 
-    async def add_viewer(self, websocket: WebSocket):
+    async def add_viewer(self, websocket: WebSocket, languages: Optional[List[str]] = None):
         await websocket.accept(); 
         self.viewers.append(websocket)
-        logging.info(f"[{self.stream_id}] 뷰어 연결됨. (총 {len(self.viewers)}명)")
+        self._set_subscription(websocket, languages)
+        logging.info(f"[{self.stream_id}] 뷰어 연결됨. (총 {len(self.viewers)}명, 구독 언어: {'전체' if languages is None else languages})")
         await websocket.send_json(self.config_data)
         for result in list(self.cache): 
             await websocket.send_json(result)
+        await self._send_cached_translations(websocket, list(self.translation_cache) if languages is None else languages)
 
     def remove_viewer(self, websocket: WebSocket):
-        self.viewers.remove(websocket)
+        if websocket in self.viewers:
+            self.viewers.remove(websocket)
+        self._clear_subscription(websocket)
         logging.info(f"[{self.stream_id}] 뷰어 연결 끊김. (남은 뷰어: {len(self.viewers)}명)")
 
+    async def subscribe_viewer(self, websocket: WebSocket, languages: Optional[List[str]]):
+        # 새로 구독한 언어의 캐시만 보내 중복 전송을 피함
+        previous = None if websocket in self.all_lang_viewers else {lang for lang, subscribers in self.lang_channels.items() if websocket in subscribers}
+        self._set_subscription(websocket, languages)
+        logging.info(f"[{self.stream_id}] 뷰어 구독 언어 변경: {'전체' if languages is None else languages}")
+        if previous is not None:
+            requested = list(self.translation_cache) if languages is None else languages
+            await self._send_cached_translations(websocket, [lang for lang in requested if lang not in previous])
+
+    async def handle_viewer_message(self, websocket: WebSocket, message: str):
+        try:
+            data = json.loads(message)
+        except json.JSONDecodeError:
+            logging.warning(f"[{self.stream_id}] 뷰어로부터 잘못된 메시지 수신: {message[:100]}")
+            return
+        if not isinstance(data, dict) or data.get('type') != 'subscribe':
+            return
+        languages = data.get('languages')
+        if not isinstance(languages, list) or not all(isinstance(lang, str) for lang in languages):
+            logging.warning(f"[{self.stream_id}] 잘못된 구독 요청 무시: {message[:100]}")
+            return
+        await self.subscribe_viewer(websocket, languages)
+
+    def _set_subscription(self, websocket: WebSocket, languages: Optional[List[str]]):
+        # None이면 전체 언어 구독, 빈 목록이면 번역을 받지 않음
+        self._clear_subscription(websocket)
+        if languages is None:
+            self.all_lang_viewers.add(websocket)
+            return
+        for lang in languages:
+            self.lang_channels.setdefault(lang, set()).add(websocket)
+
+    def _clear_subscription(self, websocket: WebSocket):
+        self.all_lang_viewers.discard(websocket)
+        for lang in list(self.lang_channels):
+            self.lang_channels[lang].discard(websocket)
+            if not self.lang_channels[lang]:
+                del self.lang_channels[lang]
+
+    async def _send_cached_translations(self, websocket: WebSocket, languages: List[str]):
+        for lang in languages:
+            for result in list(self.translation_cache.get(lang, [])):
+                await websocket.send_json(result)
+
     async def broadcast_to_viewers_and_cache(self, data: dict):
         broadcast_data = data  # 기본적으로는 받은 데이터 그대로 브로드캐스트
+        targets = self.viewers
         if data.get('type') == 'config':
             self.config_data['languages'] = data.get('languages', [])
             self.cache.clear()
+            self.translation_cache.clear()
             # 뷰어에게는 언어 설정만 포함된 config_data를 보냄
             broadcast_data = self.config_data
-        elif data.get('type') in ['final_result', 'translation_result']:
+        elif data.get('type') == 'final_result':
             self.cache.append(data)
+        elif data.get('type') == 'translation_result':
+            # [핵심 수정] 번역 결과는 해당 언어 구독자에게만 전송하고, 캐시도 언어별로 분리
+            lang = data.get('lang')
+            self.translation_cache.setdefault(lang, deque(maxlen=8)).append(data)
+            targets = self.lang_channels.get(lang, set()) | self.all_lang_viewers
 
-        if self.viewers:
+        if targets:
             # [핵심 수정] data -> broadcast_data 로 변경하여 올바른 데이터를 전송
-            await asyncio.gather(*[ws.send_json(broadcast_data) for ws in self.viewers], return_exceptions=False)
+            await asyncio.gather(*[ws.send_json(broadcast_data) for ws in targets], return_exceptions=False)
             
     async def _reset_processing_tasks(self, whisper_model: WhisperModel):
         logging.info(f"[{self.stream_id}] FFmpeg 및 처리 태스크를 초기화/재설정합니다...")
@@ -74,13 +142,18 @@ class StreamSession:
         
         self.pcm_queue = asyncio.Queue(); 
         text_queue = asyncio.Queue(); 
-        text_buffer_ref = {'buffer': ""}
+        # [추가] 프롬프트 컨텍스트는 세션 단위로 유지 (용어집 유지, 최근 문맥만 초기화)
+        if self.prompt_context is None:
+            self.prompt_context = whisper_model.create_prompt_context(self.hotwords)
+            self.hotwords = list(self.prompt_context.hotwords)
+        else:
+            self.prompt_context.reset()
         self.proc = await create_ffmpeg_process(self.stream_id)
 
        # [핵심 수정] pcm_processing_task에 세션별 침묵 구간(self.silence_threshold) 값을 전달
         tasks = [
-            pcm_processing_task(self.stream_id, self.pcm_queue, text_queue, text_buffer_ref, whisper_model, self.silence_threshold),
-            self._text_processing_task(text_queue, text_buffer_ref),
+            pcm_processing_task(self.stream_id, self.pcm_queue, text_queue, self.prompt_context, whisper_model, self.silence_threshold),
+            self._text_processing_task(text_queue),
             self._read_stdout(self.proc, self.pcm_queue),
             self._read_stderr(self.proc)
         ]
@@ -96,7 +169,8 @@ class StreamSession:
                 "type": "session_init",
                 "settings": {
                     "silence_threshold": self.silence_threshold,
-                    "translation_engine": self.translation_engine
+                    "translation_engine": self.translation_engine,
+                    "hotwords": self.hotwords
                 }
             }
             await websocket.send_json(initial_settings)
@@ -122,11 +196,20 @@ class StreamSession:
                         # 세션의 설정 값을 클라이언트가 보낸 값으로 업데이트
                         self.silence_threshold = data.get('silence_threshold', self.silence_threshold)
                         self.translation_engine = data.get('translation_engine', self.translation_engine)
+                        hotwords = data.get('hotwords')
+                        if isinstance(hotwords, list) and all(isinstance(w, str) for w in hotwords):
+                            self.hotwords = clean_hotwords(hotwords)
+                            if self.prompt_context:
+                                # 토큰 예산 때문에 제외된 용어가 있으면 실제 적용된 목록을 저장
+                                self.prompt_context.set_hotwords(self.hotwords)
+                                self.hotwords = list(self.prompt_context.hotwords)
+                        elif hotwords is not None:
+                            logging.warning(f"[{self.stream_id}] 잘못된 용어집 형식 무시: {hotwords!r}")
 
                         # 번역 언어 설정은 기존 로직대로 처리하여 뷰어에게 브로드캐스팅
                         lang_config_data = {'type': 'config', 'languages': data.get('languages', [])}
                         
-                        logging.info(f"[{self.stream_id}] 컨트롤러 설정 변경: 언어={lang_config_data['languages']}, 침묵={self.silence_threshold}s, 엔진='{self.translation_engine}'")
+                        logging.info(f"[{self.stream_id}] 컨트롤러 설정 변경: 언어={lang_config_data['languages']}, 침묵={self.silence_threshold}s, 엔진='{self.translation_engine}', 용어집={len(self.hotwords)}개")
                         await self.broadcast_to_viewers_and_cache(lang_config_data)
 
                 elif 'bytes' in message:
@@ -160,7 +243,7 @@ class StreamSession:
         self.manager.remove_session_if_empty(self.stream_id)
         logging.info(f"[{self.stream_id}] 세션 정리 완료.")
 
-    async def _text_processing_task(self, text_queue: asyncio.Queue, text_buffer_ref: Dict):
+    async def _text_processing_task(self, text_queue: asyncio.Queue):
         logging.info(f"[{self.stream_id}] 텍스트 처리 태스크 시작됨.")
         try:
             loop = asyncio.get_event_loop()
@@ -174,21 +257,18 @@ class StreamSession:
                     if not current_buffer: 
                         return
                     should_translate = False
-                    last_word = current_buffer.split()[-1] if current_buffer else ""
-                    is_semantically_incomplete = any(last_word.endswith(e) for e in CONNECTING_ENDINGS) or last_word in CONNECTING_WORDS
                     if force_reason == 'punctuation':
                         should_translate = True
                     elif not force_reason:
                         current_time = loop.time()
                         is_timeout = last_text_received_time and (current_time - last_text_received_time > TRANSLATION_TIMEOUT_S)
                         is_long_enough = len(current_buffer) >= MIN_LENGTH_FOR_TIMEOUT_TRANSLATION
-                        if is_timeout and is_long_enough and not is_semantically_incomplete:
+                        if is_timeout and is_long_enough and not is_semantically_incomplete(current_buffer):
                             should_translate = True
                     
                     if should_translate:
                         final_original_text = text_buffer.strip()
                         text_buffer = ""
-                        text_buffer_ref['buffer'] = ""
                         last_text_received_time = None
                         result_id = str(time.time())
                         log_reason = f"(강제: {force_reason})" if force_reason else "(타임아웃)"
@@ -231,14 +311,13 @@ class StreamSession:
                     if text_buffer.strip() and transcribed_text:
                         text_buffer += " "
                     text_buffer += transcribed_text
-                    text_buffer_ref['buffer'] = text_buffer.strip()
                     last_text_received_time = loop.time()
                     interim_payload = {'type': 'interim_result', 'text': text_buffer.strip()}
                     if self.controller:
                         await self.controller.send_json(interim_payload)
                     await self.broadcast_to_viewers_and_cache(interim_payload)
                     cleaned_text = text_buffer.strip()
-                    if cleaned_text.endswith(('습니다.', '니다.', '까요?', '이죠?', '데요!', '하죠.', '시오.')):
+                    if cleaned_text.endswith(SENTENCE_ENDINGS):
                         await asyncio.sleep(0.3)
                         if last_text_received_time and (loop.time() - last_text_received_time >= 0.3):
                             await trigger_translation_if_needed(force_reason='punctuation')
@@ -300,6 +379,13 @@ class StreamManager:
                 self.streams[stream_id] = StreamSession(stream_id, self)
             return self.streams[stream_id]
 
+    def has_active_streams(self) -> bool:
+        # 컨트롤러가 연결되어 있거나 처리 태스크가 돌고 있는 세션이 있으면 실시간 방송 중으로 봄
+        return any(
+            session.controller is not None or any(not task.done() for task in session.background_tasks)
+            for session in self.streams.values()
+        )
+
     def remove_session_if_empty(self, stream_id: str):
         if stream_id in self.streams:
             session = self.streams[stream_id]
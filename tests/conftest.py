@@ -0,0 +1,7 @@
+# conftest.py
+
+import os
+import sys
+
+# 프로젝트 모듈이 루트에 평평하게 놓여 있으므로 루트를 import 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
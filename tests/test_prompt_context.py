@@ -0,0 +1,85 @@
+# test_prompt_context.py
+
+import logging
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from prompt_context import PromptContext
+
+def byte_encode(text):
+    # 바이트 단위 토큰화: 한글 한 글자가 여러 토큰으로 나뉘는 Whisper의 바이트 BPE와 같은 성질
+    return list(text.encode('utf-8'))
+
+def byte_decode(ids):
+    return bytes(ids).decode('utf-8')
+
+def make_context(hotwords=(), max_tokens=64, glossary_max_tokens=32):
+    return PromptContext(byte_encode, hotwords=list(hotwords), max_tokens=max_tokens, glossary_max_tokens=glossary_max_tokens)
+
+def test_glossary_drops_whole_trailing_hotwords(caplog):
+    with caplog.at_level(logging.WARNING):
+        context = make_context(["제노글로벌", "홍길동", "세미나"], glossary_max_tokens=30)
+
+    assert context.hotwords == ["제노글로벌", "홍길동"]
+    assert byte_decode(context.glossary_ids) == " 제노글로벌, 홍길동."
+    assert "세미나" in caplog.text
+
+def test_history_evicts_oldest_first():
+    context = make_context(max_tokens=12)
+    for text in ["aaa", "bbb", "ccc", "ddd"]:
+        context.commit(text)
+
+    assert [text for text, _ in context.history] == ["bbb", "ccc", "ddd"]
+    assert context.history_token_count == 12
+    assert byte_decode(context.prompt_ids()) == " bbb ccc ddd"
+
+def test_single_long_utterance_keeps_whole_trailing_words():
+    context = make_context(max_tokens=20)
+    context.commit("안녕하세요 여러분 반갑습니다")
+
+    (text, ids), = context.history
+    assert len(ids) <= 20
+    assert text == "반갑습니다"
+    # 글자 중간이 잘리지 않고, 저장된 텍스트와 토큰이 일치
+    assert byte_decode(context.prompt_ids()) == " 반갑습니다"
+    assert context.prompt_text() == "반갑습니다"
+    assert context.history_token_count == len(ids)
+
+def test_single_word_over_budget_is_dropped():
+    context = make_context(max_tokens=5)
+    context.commit("반갑습니다")
+
+    assert not context.history
+    assert context.history_token_count == 0
+    assert context.prompt_ids() is None
+
+def test_prompt_ids_cache_invalidation():
+    context = make_context(["AB"])
+    first = context.prompt_ids()
+    assert context.prompt_ids() is first
+
+    context.commit("hello")
+    after_commit = context.prompt_ids()
+    assert after_commit is not first
+    assert byte_decode(after_commit) == " AB. hello"
+
+    context.set_hotwords(["CD"])
+    after_hotwords = context.prompt_ids()
+    assert byte_decode(after_hotwords) == " CD. hello"
+
+    context.set_hotwords(["CD"])
+    assert context.prompt_ids() is after_hotwords  # 같은 용어집이면 캐시 유지
+
+    context.reset()
+    assert byte_decode(context.prompt_ids()) == " CD."
+
+def test_reset_keeps_glossary():
+    context = make_context(["제노글로벌"])
+    context.commit("첫 문장")
+    context.reset()
+
+    assert context.hotwords == ["제노글로벌"]
+    assert not context.history
+    assert context.prompt_text() == "제노글로벌."
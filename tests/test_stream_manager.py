@@ -0,0 +1,121 @@
+# test_stream_manager.py
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("faster_whisper")
+
+from stream_manager import StreamSession
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+    def translations(self):
+        return [(d['lang'], d['original_id']) for d in self.sent if d.get('type') == 'translation_result']
+
+def translation(lang, result_id="1"):
+    return {'type': 'translation_result', 'original_id': result_id, 'lang': lang, 'text': f"{lang}-{result_id}"}
+
+async def make_session_with_results(languages=("en", "ja", "zh")):
+    session = StreamSession("test", manager=None)
+    await session.broadcast_to_viewers_and_cache({'type': 'config', 'languages': list(languages)})
+    await session.broadcast_to_viewers_and_cache({'type': 'final_result', 'original': "원문", 'id': "1"})
+    for lang in languages:
+        await session.broadcast_to_viewers_and_cache(translation(lang))
+    return session
+
+def test_translation_reaches_only_language_channel_and_all_language_viewers():
+    async def run():
+        session = StreamSession("test", manager=None)
+        en_viewer, ja_viewer, all_viewer, none_viewer = FakeWebSocket(), FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await session.add_viewer(en_viewer, ["en"])
+        await session.add_viewer(ja_viewer, ["ja"])
+        await session.add_viewer(all_viewer, None)
+        await session.add_viewer(none_viewer, [])
+
+        await session.broadcast_to_viewers_and_cache(translation("en"))
+        await session.broadcast_to_viewers_and_cache({'type': 'final_result', 'original': "원문", 'id': "2"})
+        return en_viewer, ja_viewer, all_viewer, none_viewer
+
+    en_viewer, ja_viewer, all_viewer, none_viewer = asyncio.run(run())
+    assert en_viewer.translations() == [("en", "1")]
+    assert ja_viewer.translations() == []
+    assert all_viewer.translations() == [("en", "1")]
+    assert none_viewer.translations() == []
+    # 원문은 구독과 관계없이 모든 뷰어에게 전송
+    for viewer in (en_viewer, ja_viewer, all_viewer, none_viewer):
+        assert any(d.get('type') == 'final_result' for d in viewer.sent)
+
+def test_late_join_replay_is_filtered_by_language():
+    async def run():
+        session = await make_session_with_results()
+        ja_viewer, all_viewer, none_viewer = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await session.add_viewer(ja_viewer, ["ja"])
+        await session.add_viewer(all_viewer, None)
+        await session.add_viewer(none_viewer, [])
+        return ja_viewer, all_viewer, none_viewer
+
+    ja_viewer, all_viewer, none_viewer = asyncio.run(run())
+    assert ja_viewer.sent[0]['type'] == 'config'
+    assert ja_viewer.translations() == [("ja", "1")]
+    assert sorted(all_viewer.translations()) == [("en", "1"), ("ja", "1"), ("zh", "1")]
+    assert none_viewer.translations() == []
+    for viewer in (ja_viewer, all_viewer, none_viewer):
+        assert [d['id'] for d in viewer.sent if d.get('type') == 'final_result'] == ["1"]
+
+def test_switching_subscription_replays_only_new_languages():
+    async def run():
+        session = await make_session_with_results()
+        viewer, all_viewer = FakeWebSocket(), FakeWebSocket()
+        await session.add_viewer(viewer, ["en"])
+        await session.handle_viewer_message(viewer, '{"type": "subscribe", "languages": ["en", "zh"]}')
+        await session.handle_viewer_message(viewer, '{"type": "subscribe", "languages": ["zh"]}')
+
+        await session.add_viewer(all_viewer, None)
+        await session.subscribe_viewer(all_viewer, ["ja"])
+        return session, viewer, all_viewer
+
+    session, viewer, all_viewer = asyncio.run(run())
+    assert viewer.translations() == [("en", "1"), ("zh", "1")]
+    # 전체 언어를 받던 뷰어는 이미 모든 캐시를 받았으므로 다시 보내지 않음
+    assert sorted(all_viewer.translations()) == [("en", "1"), ("ja", "1"), ("zh", "1")]
+    assert session.lang_channels == {"zh": {viewer}, "ja": {all_viewer}}
+
+def test_invalid_subscribe_messages_are_ignored():
+    async def run():
+        session = StreamSession("test", manager=None)
+        viewer = FakeWebSocket()
+        await session.add_viewer(viewer, ["en"])
+        for message in ['[1]', '"x"', 'not json', '{"type": "subscribe", "languages": "en"}',
+                        '{"type": "subscribe", "languages": [{}]}']:
+            await session.handle_viewer_message(viewer, message)
+        return session, viewer
+
+    session, viewer = asyncio.run(run())
+    assert session.lang_channels == {"en": {viewer}}
+    assert not session.all_lang_viewers
+
+def test_remove_viewer_empties_channels():
+    async def run():
+        session = StreamSession("test", manager=None)
+        en_viewer, all_viewer = FakeWebSocket(), FakeWebSocket()
+        await session.add_viewer(en_viewer, ["en", "ja"])
+        await session.add_viewer(all_viewer, None)
+        session.remove_viewer(en_viewer)
+        session.remove_viewer(all_viewer)
+        session.remove_viewer(all_viewer)  # 중복 정리도 안전해야 함
+        return session
+
+    session = asyncio.run(run())
+    assert session.viewers == []
+    assert session.lang_channels == {}
+    assert session.all_lang_viewers == set()
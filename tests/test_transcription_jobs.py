@@ -0,0 +1,156 @@
+# test_transcription_jobs.py
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("faster_whisper")
+
+import models
+import transcription_jobs
+from config import SAMPLE_RATE, OFFLINE_BATCH_SIZE, OFFLINE_MAX_CLIP_S
+from models import WhisperModel
+from transcription_jobs import JobManager, TranscriptionJob, plan_batches
+
+class FakeTokenizer:
+    def encode(self, text, add_special_tokens=False):
+        return SimpleNamespace(ids=list(text.encode('utf-8')))
+
+class FakeBatchedPipeline:
+    """미리 정한 (압축된 버퍼 기준) 세그먼트 시각을 돌려주는 배치 파이프라인."""
+
+    def __init__(self, segment_bounds=()):
+        self.segment_bounds = list(segment_bounds)
+        self.calls = []
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append({'audio_samples': len(audio), **kwargs})
+        segments = [SimpleNamespace(start=start, end=end, text=f" 문장 {i}") for i, (start, end) in enumerate(self.segment_bounds)]
+        return iter(segments), None
+
+def make_whisper_model(segment_bounds=()) -> WhisperModel:
+    whisper_model = WhisperModel.__new__(WhisperModel)
+    whisper_model.model = SimpleNamespace(hf_tokenizer=FakeTokenizer())
+    whisper_model.batched_model = FakeBatchedPipeline(segment_bounds)
+    whisper_model.live_requests = 0
+    whisper_model.last_live_request_at = float('-inf')
+    return whisper_model
+
+@pytest.fixture
+def fake_file_job(monkeypatch, tmp_path):
+    speech_segments = [
+        (1.0, np.zeros(2 * SAMPLE_RATE, dtype=np.int16)),
+        (600.0, np.zeros(3 * SAMPLE_RATE, dtype=np.int16)),
+    ]
+
+    async def fake_decode_audio_file(path):
+        return b""
+
+    monkeypatch.setattr(transcription_jobs, 'decode_audio_file', fake_decode_audio_file)
+    monkeypatch.setattr(transcription_jobs, 'iter_speech_segments', lambda pcm_bytes, silence: iter(speech_segments))
+    monkeypatch.setattr(models, 'preprocess_audio', lambda audio_np: audio_np.astype(np.float32) / 32768.0)
+    monkeypatch.setattr(transcription_jobs, 'OFFLINE_LIVE_POLL_S', 0.01)
+    monkeypatch.setattr(transcription_jobs, 'OFFLINE_LIVE_COOLDOWN_S', 0)
+
+    upload = tmp_path / "session.wav"
+    upload.write_bytes(b"")
+    return upload
+
+async def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+
+def test_job_with_hotwords_passes_text_prompt_and_original_timestamps(fake_file_job):
+    async def run():
+        # 두 발화는 하나의 창(0~5초)으로 묶이고, 세그먼트 시각은 압축된 버퍼 기준으로 돌아옴
+        whisper_model = make_whisper_model(segment_bounds=[(0.0, 2.0), (2.0, 5.0)])
+        manager = JobManager()
+        manager.start(whisper_model)
+        job = TranscriptionJob("session.wav", str(fake_file_job), [], 'deepl', ["제노글로벌", "홍길동"])
+        await manager.submit(job)
+        await wait_until(lambda: job.is_finished)
+        await manager.stop()
+        return whisper_model, job
+
+    whisper_model, job = asyncio.run(run())
+
+    assert job.status == 'completed', job.error
+    call, = whisper_model.batched_model.calls
+    assert isinstance(call['initial_prompt'], str)
+    assert "제노글로벌" in call['initial_prompt'] and "홍길동" in call['initial_prompt']
+    # 침묵 구간은 버퍼에 포함되지 않고, 창 경계는 초 단위로 전달됨
+    assert call['audio_samples'] == 5 * SAMPLE_RATE
+    assert call['clip_timestamps'] == [{'start': 0.0, 'end': 5.0}]
+    assert call['batch_size'] == OFFLINE_BATCH_SIZE
+    # 결과 시각은 원본 파일 기준으로 복원됨
+    assert [(s['start'], s['end']) for s in job.segments] == [(1.0, 3.0), (600.0, 603.0)]
+    assert not fake_file_job.exists()
+
+def test_batch_does_not_start_while_live_room_is_active(fake_file_job):
+    live = {'active': True}
+
+    async def run():
+        whisper_model = make_whisper_model(segment_bounds=[(0.0, 2.0)])
+        manager = JobManager()
+        manager.start(whisper_model, lambda: live['active'])
+        job = TranscriptionJob("session.wav", str(fake_file_job), [], 'deepl', [])
+        await manager.submit(job)
+
+        await wait_until(lambda: job.status == 'paused')
+        await asyncio.sleep(0.1)
+        paused_calls = len(whisper_model.batched_model.calls)
+        paused_status = job.status
+
+        live['active'] = False
+        await wait_until(lambda: job.is_finished)
+        await manager.stop()
+        return whisper_model, job, paused_calls, paused_status
+
+    whisper_model, job, paused_calls, paused_status = asyncio.run(run())
+
+    assert paused_status == 'paused'
+    assert paused_calls == 0
+    assert job.status == 'completed', job.error
+    assert len(whisper_model.batched_model.calls) == 1
+
+def test_batch_waits_for_cooldown_after_live_request(fake_file_job, monkeypatch):
+    monkeypatch.setattr(transcription_jobs, 'OFFLINE_LIVE_COOLDOWN_S', 0.3)
+
+    async def run():
+        whisper_model = make_whisper_model(segment_bounds=[(0.0, 2.0)])
+        whisper_model.last_live_request_at = time.monotonic()
+        manager = JobManager()
+        manager.start(whisper_model)
+        job = TranscriptionJob("session.wav", str(fake_file_job), [], 'deepl', [])
+        await manager.submit(job)
+
+        await asyncio.sleep(0.1)
+        calls_during_cooldown = len(whisper_model.batched_model.calls)
+        await wait_until(lambda: job.is_finished)
+        await manager.stop()
+        return job, calls_during_cooldown
+
+    job, calls_during_cooldown = asyncio.run(run())
+
+    assert calls_during_cooldown == 0
+    assert job.status == 'completed', job.error
+
+def test_plan_batches_packs_short_clips_into_full_windows():
+    long_segment = [(0.0, np.zeros((OFFLINE_MAX_CLIP_S * 2 + 5) * SAMPLE_RATE, dtype=np.int16))]
+    short_segments = [(100.0 + i * 20, np.zeros(5 * SAMPLE_RATE, dtype=np.int16)) for i in range(100)]
+
+    batches = plan_batches(long_segment + short_segments)
+
+    windows = [window for batch in batches for window in batch]
+    for window in windows:
+        assert sum(len(audio_np) for _, audio_np in window) <= OFFLINE_MAX_CLIP_S * SAMPLE_RATE
+    # 긴 발화는 30초, 30초, 5초로 나뉘고, 마지막 5초 조각부터 짧은 발화들이 창을 채움
+    assert [start for start, _ in windows[0] + windows[1]] == [0.0, float(OFFLINE_MAX_CLIP_S)]
+    assert len(windows[2]) == OFFLINE_MAX_CLIP_S // 5
+    assert len(windows) == 2 + (1 + 100) * 5 // OFFLINE_MAX_CLIP_S + 1
+    assert all(len(batch) == OFFLINE_BATCH_SIZE for batch in batches[:-1])
+    assert sum(len(window) for window in windows) == 3 + 100
@@ -0,0 +1,187 @@
+# transcription_jobs.py
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Callable, List, Dict, Optional, Tuple
+
+import numpy as np
+
+from models import WhisperModel, TRANSLATORS
+from audio_processing import decode_audio_file, iter_speech_segments
+from config import (
+    SAMPLE_RATE, SILENCE_THRESHOLD_S, OFFLINE_BATCH_SIZE, OFFLINE_MAX_CLIP_S,
+    OFFLINE_LIVE_COOLDOWN_S, OFFLINE_LIVE_POLL_S, OFFLINE_MAX_JOBS
+)
+
+def format_srt_timestamp(seconds: float) -> str:
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+def plan_batches(speech_segments: List[Tuple[float, np.ndarray]]) -> List[List[List[Tuple[float, np.ndarray]]]]:
+    """발화 구간을 Whisper 입력 창(최대 OFFLINE_MAX_CLIP_S초) 단위로 묶고, 창 OFFLINE_BATCH_SIZE개씩 배치로 나눈다.
+
+    긴 발화는 창 길이로 자르고, 짧은 발화는 창이 찰 때까지 이어 붙여 배치의 각 항목을 최대한 채운다.
+    """
+    max_window_samples = OFFLINE_MAX_CLIP_S * SAMPLE_RATE
+    windows, current, current_samples = [], [], 0
+    for start_s, audio_np in speech_segments:
+        for clip_start in range(0, len(audio_np), max_window_samples):
+            clip = audio_np[clip_start:clip_start + max_window_samples]
+            if current and current_samples + len(clip) > max_window_samples:
+                windows.append(current)
+                current, current_samples = [], 0
+            current.append((start_s + clip_start / SAMPLE_RATE, clip))
+            current_samples += len(clip)
+    if current:
+        windows.append(current)
+    return [windows[i:i + OFFLINE_BATCH_SIZE] for i in range(0, len(windows), OFFLINE_BATCH_SIZE)]
+
+class TranscriptionJob:
+    def __init__(self, filename: str, file_path: str, languages: List[str], translation_engine: str, hotwords: List[str]):
+        self.job_id = uuid.uuid4().hex
+        self.filename = filename
+        self.file_path = file_path
+        self.languages = languages
+        self.translation_engine = translation_engine
+        self.hotwords = hotwords
+        self.status = 'queued'  # queued -> decoding -> transcribing (<-> paused) -> translating -> completed / failed
+        self.progress = 0.0
+        self.error: Optional[str] = None
+        self.segments: List[Dict] = []
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ('completed', 'failed')
+
+    def to_status(self) -> dict:
+        return {
+            'job_id': self.job_id,
+            'filename': self.filename,
+            'status': self.status,
+            'progress': round(self.progress, 3),
+            'languages': self.languages,
+            'translation_engine': self.translation_engine,
+            'segments': len(self.segments),
+            'error': self.error,
+        }
+
+    def to_json(self) -> dict:
+        return {**self.to_status(), 'segments': self.segments}
+
+    def to_srt(self, lang: Optional[str] = None) -> str:
+        # lang이 없으면 원문, 있으면 해당 언어 번역으로 자막 생성
+        blocks = []
+        for index, segment in enumerate(self.segments, 1):
+            text = segment['translations'].get(lang, "") if lang else segment['text']
+            blocks.append(f"{index}\n{format_srt_timestamp(segment['start'])} --> {format_srt_timestamp(segment['end'])}\n{text}\n")
+        return "\n".join(blocks)
+
+class JobManager:
+    """녹화 파일 전사 작업 큐. 작업은 하나씩 처리되며, 실시간 방송이 있는 동안에는 배치를 시작하지 않는다."""
+
+    def __init__(self):
+        self.jobs: Dict[str, TranscriptionJob] = {}
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker_task: Optional[asyncio.Task] = None
+        self.is_live_active: Callable[[], bool] = lambda: False
+
+    def start(self, whisper_model: WhisperModel, is_live_active: Optional[Callable[[], bool]] = None):
+        if is_live_active:
+            self.is_live_active = is_live_active
+        self.queue = asyncio.Queue()
+        self.worker_task = asyncio.create_task(self._worker(whisper_model))
+        logging.info("파일 전사 작업 큐 시작됨.")
+
+    async def stop(self):
+        if self.worker_task and not self.worker_task.done():
+            self.worker_task.cancel()
+            await asyncio.gather(self.worker_task, return_exceptions=True)
+        for job in self.jobs.values():
+            if not job.is_finished and os.path.exists(job.file_path):
+                os.remove(job.file_path)
+
+    async def submit(self, job: TranscriptionJob) -> TranscriptionJob:
+        self._evict_finished_jobs()
+        self.jobs[job.job_id] = job
+        await self.queue.put(job)
+        logging.info(f"[job:{job.job_id}] 파일 전사 작업 등록됨: '{job.filename}' (대기 작업: {self.queue.qsize()}개)")
+        return job
+
+    def get_job(self, job_id: str) -> Optional[TranscriptionJob]:
+        return self.jobs.get(job_id)
+
+    def _evict_finished_jobs(self):
+        finished = sorted((job for job in self.jobs.values() if job.is_finished), key=lambda job: job.finished_at)
+        while len(self.jobs) >= OFFLINE_MAX_JOBS and finished:
+            del self.jobs[finished.pop(0).job_id]
+
+    async def _worker(self, whisper_model: WhisperModel):
+        try:
+            while True:
+                job = await self.queue.get()
+                try:
+                    await self._process(job, whisper_model)
+                    job.status = 'completed'
+                    logging.info(f"[job:{job.job_id}] 파일 전사 완료 ({len(job.segments)}개 구간, {time.time() - job.created_at:.1f}s).")
+                except Exception as e:
+                    job.status, job.error = 'failed', str(e)
+                    logging.error(f"[job:{job.job_id}] 파일 전사 작업 실패:", exc_info=True)
+                finally:
+                    job.finished_at = time.time()
+                    if os.path.exists(job.file_path):
+                        os.remove(job.file_path)
+        except asyncio.CancelledError:
+            logging.info("파일 전사 작업 큐 종료됨.")
+
+    async def _process(self, job: TranscriptionJob, whisper_model: WhisperModel):
+        job.status = 'decoding'
+        pcm_bytes = await decode_audio_file(job.file_path)
+        speech_segments = await asyncio.to_thread(lambda: list(iter_speech_segments(pcm_bytes, SILENCE_THRESHOLD_S)))
+        del pcm_bytes
+        batches = plan_batches(speech_segments)
+        logging.info(f"[job:{job.job_id}] 디코딩 완료. {len(speech_segments)}개 발화 구간, {len(batches)}개 배치.")
+
+        # 전사 단계가 전체 진행률의 대부분을 차지하고, 번역이 있으면 나머지를 차지
+        transcribe_weight = 0.8 if job.languages else 1.0
+        job.status = 'transcribing'
+        prompt_context = whisper_model.create_prompt_context(job.hotwords or None)
+        for index, batch in enumerate(batches, 1):
+            await self._wait_for_live_idle(job, whisper_model)
+            for start, end, text in await whisper_model.transcribe_batch(batch, prompt_context=prompt_context):
+                job.segments.append({'id': len(job.segments) + 1, 'start': round(start, 3), 'end': round(end, 3), 'text': text, 'translations': {}})
+            job.progress = transcribe_weight * index / len(batches)
+
+        if job.languages:
+            translator = TRANSLATORS.get(job.translation_engine)
+            if not translator:
+                raise RuntimeError(f"'{job.translation_engine}' 번역기를 서버에서 사용할 수 없습니다. (API 키 확인 필요)")
+            job.status = 'translating'
+            for index, segment in enumerate(job.segments, 1):
+                translations = await asyncio.gather(*[translator.translate(segment['text'], lang) for lang in job.languages])
+                segment['translations'] = dict(zip(job.languages, translations))
+                job.progress = transcribe_weight + (1 - transcribe_weight) * index / len(job.segments)
+        job.progress = 1.0
+
+    async def _wait_for_live_idle(self, job: TranscriptionJob, whisper_model: WhisperModel):
+        # 실시간 세션이 연결되어 있거나 최근에 실시간 인식이 있었다면 배치를 시작하지 않고 대기
+        while True:
+            idle_for = time.monotonic() - whisper_model.last_live_request_at
+            if whisper_model.live_requests == 0 and not self.is_live_active() and idle_for >= OFFLINE_LIVE_COOLDOWN_S:
+                break
+            if job.status != 'paused':
+                logging.info(f"[job:{job.job_id}] 실시간 방송이 진행 중이어서 파일 전사를 일시 중지합니다.")
+                job.status = 'paused'
+            await asyncio.sleep(OFFLINE_LIVE_POLL_S)
+        if job.status == 'paused':
+            logging.info(f"[job:{job.job_id}] 실시간 방송이 없어 파일 전사를 재개합니다.")
+        job.status = 'transcribing'
+
+job_manager = JobManager()